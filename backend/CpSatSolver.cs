@@ -0,0 +1,565 @@
+namespace EndField.Solver;
+
+using System.Runtime.CompilerServices;
+using Google.OrTools.Sat;
+using EndField.Solver.Models;
+
+public static partial class BuildingDefinitions
+{
+    public static readonly Dictionary<BuildingType, Models.BuildingDef> Buildings = new()
+    {
+        {
+            BuildingType.Filler,
+            new Models.BuildingDef
+            {
+                Type = BuildingType.Filler,
+                Name = "灌装机",
+                Width = 3,
+                Length = 6,
+                InputCount = 6,
+                OutputCount = 6
+            }
+        },
+        {
+            BuildingType.Grinder,
+            new Models.BuildingDef
+            {
+                Type = BuildingType.Grinder,
+                Name = "研磨机",
+                Width = 3,
+                Length = 6,
+                InputCount = 6,
+                OutputCount = 6
+            }
+        },
+        {
+            BuildingType.Molder,
+            new Models.BuildingDef
+            {
+                Type = BuildingType.Molder,
+                Name = "塑形机",
+                Width = 3,
+                Length = 3,
+                InputCount = 3,
+                OutputCount = 3
+            }
+        },
+        {
+            BuildingType.Refinery,
+            new Models.BuildingDef
+            {
+                Type = BuildingType.Refinery,
+                Name = "精炼炉",
+                Width = 3,
+                Length = 3,
+                InputCount = 3,
+                OutputCount = 3
+            }
+        },
+        {
+            BuildingType.Crusher,
+            new Models.BuildingDef
+            {
+                Type = BuildingType.Crusher,
+                Name = "粉碎机",
+                Width = 3,
+                Length = 3,
+                InputCount = 3,
+                OutputCount = 3
+            }
+        }
+    };
+
+    public static int FootprintArea(BuildingType type)
+    {
+        var def = Buildings[type];
+        return def.Width * def.Length;
+    }
+}
+
+public class CpSatSolver
+{
+    public static (double W, double H) EstimateInitialBounds(Models.ProductionGraph graph)
+    {
+        var totalArea = graph.Nodes.Sum(n => BuildingDefinitions.FootprintArea(n.Type));
+        var side = Math.Ceiling(Math.Sqrt(totalArea));
+        return (side, side);
+    }
+
+    // Bounds after k expansion steps along the searched axis. With no fixed
+    // dimension both sides grow together from the configured rectangle.
+    private static (int Width, int Height) BoundsAt(
+        int baseW,
+        int baseH,
+        Models.SolverConfig config,
+        int k
+    )
+    {
+        var step = Math.Max(1, config.ExpansionStep);
+        return config.FixedDimensionMode switch
+        {
+            FixedDimensionMode.Width => (baseW, baseH + k * step),
+            FixedDimensionMode.Height => (baseW + k * step, baseH),
+            _ => (baseW + k * step, baseH + k * step)
+        };
+    }
+
+    // Steps needed along the searched axis to reach a packed size. With no
+    // fixed dimension both sides grow together, so the larger deficit wins.
+    private static int StepsToReach(
+        int baseW,
+        int baseH,
+        Models.SolverConfig config,
+        int targetW,
+        int targetH
+    )
+    {
+        var step = Math.Max(1, config.ExpansionStep);
+        int Steps(int target, int baseDim) => Math.Max(0, (target - baseDim + step - 1) / step);
+
+        return config.FixedDimensionMode switch
+        {
+            FixedDimensionMode.Width => Steps(targetH, baseH),
+            FixedDimensionMode.Height => Steps(targetW, baseW),
+            _ => Math.Max(Steps(targetW, baseW), Steps(targetH, baseH))
+        };
+    }
+
+    // Step count at which BoundsAt reaches a size that is feasible by
+    // construction: all buildings in a single row (or column when the width
+    // is fixed). With no fixed dimension this is the larger of the row-length
+    // deficit against baseW and the building-width deficit against baseH.
+    private static int MaxSteps(
+        Models.ProductionGraph graph,
+        int baseW,
+        int baseH,
+        Models.SolverConfig config
+    )
+    {
+        var defs = graph.Nodes.Select(n => BuildingDefinitions.Buildings[n.Type]).ToList();
+        var rowLength = defs.Sum(d => d.Length);
+        var rowWidth = defs.Count > 0 ? defs.Max(d => d.Width) : 0;
+
+        return config.FixedDimensionMode == FixedDimensionMode.Width
+            ? StepsToReach(baseW, baseH, config, 0, defs.Sum(d => d.Width))
+            : StepsToReach(baseW, baseH, config, rowLength, rowWidth);
+    }
+
+    // Next-fit decreasing-height shelf packing of (along, across) footprints
+    // into a strip of the given size. Returns the extent needed across the
+    // strip, or null if some footprint is longer than the strip.
+    private static int? ShelfPackExtent(IEnumerable<(int Along, int Across)> footprints, int stripSize)
+    {
+        var extent = 0;
+        var shelfUsed = 0;
+        var shelfDepth = 0;
+
+        foreach (var (along, across) in footprints.OrderByDescending(f => f.Across))
+        {
+            if (along > stripSize)
+                return null;
+
+            if (shelfUsed + along > stripSize)
+            {
+                extent += shelfDepth;
+                (shelfUsed, shelfDepth) = (0, 0);
+            }
+
+            // Footprints arrive in decreasing depth, so the first one on a
+            // shelf sets its depth.
+            if (shelfDepth == 0)
+                shelfDepth = across;
+            shelfUsed += along;
+        }
+
+        return extent + shelfDepth;
+    }
+
+    // Step count whose bounds fit a shelf packing of the graph. This is a
+    // cheap, usually feasible starting point for the upper probe.
+    private static int ShelfPackSteps(
+        Models.ProductionGraph graph,
+        int baseW,
+        int baseH,
+        Models.SolverConfig config
+    )
+    {
+        var defs = graph.Nodes.Select(n => BuildingDefinitions.Buildings[n.Type]).ToList();
+        var rows = defs.Select(d => (d.Length, d.Width));
+
+        switch (config.FixedDimensionMode)
+        {
+            case FixedDimensionMode.Width:
+                var packedH = ShelfPackExtent(rows, baseW);
+                return packedH == null ? 0 : StepsToReach(baseW, baseH, config, 0, packedH.Value);
+            case FixedDimensionMode.Height:
+                var packedW = ShelfPackExtent(defs.Select(d => (d.Width, d.Length)), baseH);
+                return packedW == null ? 0 : StepsToReach(baseW, baseH, config, packedW.Value, 0);
+            default:
+                // Strip at least as wide as the configured width, so the rectangle
+                // the user asked for keeps its orientation.
+                var totalArea = defs.Sum(d => d.Width * d.Length);
+                var stripW = Math.Max(
+                    Math.Max((int)Math.Ceiling(Math.Sqrt(totalArea * 1.2)), baseW),
+                    defs.Count > 0 ? defs.Max(d => d.Length) : 0
+                );
+                return StepsToReach(baseW, baseH, config, stripW, ShelfPackExtent(rows, stripW) ?? 0);
+        }
+    }
+
+    public static (string Status, List<Models.PlacedBuilding> Placements) TrySolve(
+        Models.ProductionGraph graph,
+        int width,
+        int height,
+        int timeoutMs
+    )
+    {
+        return new IncrementalPlacementSolver(graph, width, height).Solve(width, height, timeoutMs);
+    }
+
+    private static async Task<(Models.SolverAttempt Attempt, List<Models.PlacedBuilding> Placements)> RunAttemptAsync(
+        IncrementalPlacementSolver placementSolver,
+        int iteration,
+        int width,
+        int height,
+        Models.SolverConfig config,
+        CancellationToken cancellationToken
+    )
+    {
+        // CP-SAT blocks for up to the attempt timeout; run it on the thread
+        // pool so the hub's connection stays responsive meanwhile.
+        var (status, placements) = await Task.Run(
+            () => placementSolver.Solve(width, height, config.TimeoutMsPerAttempt, cancellationToken),
+            cancellationToken
+        );
+        cancellationToken.ThrowIfCancellationRequested();
+
+        var attempt = new Models.SolverAttempt
+        {
+            Iteration = iteration,
+            Width = width,
+            Height = height,
+            Status = status
+        };
+        return (attempt, placements);
+    }
+
+    public static async IAsyncEnumerable<object> SolveIterative(
+        Models.ProductionGraph graph,
+        Models.SolverConfig config,
+        [EnumeratorCancellation] CancellationToken cancellationToken = default
+    )
+    {
+        var startTime = DateTime.Now;
+        var attempts = new List<Models.SolverAttempt>();
+
+        var (estW, estH) = EstimateInitialBounds(graph);
+        var baseW = config.InitialWidth ?? (int)estW;
+        var baseH = config.InitialHeight ?? (int)estH;
+
+        var maxSteps = MaxSteps(graph, baseW, baseH, config);
+        var (maxW, maxH) = BoundsAt(baseW, baseH, config, maxSteps);
+        var placementSolver = new IncrementalPlacementSolver(graph, maxW, maxH);
+
+        // Feasibility is monotone in the searched dimension. Double the upper
+        // probe (starting at a shelf-packing bound) until it is feasible,
+        // then binary-search the step count between lo and hi.
+        var (w, h) = (baseW, baseH);
+        var lo = 0;
+        var hi = Math.Min(maxSteps, ShelfPackSteps(graph, baseW, baseH, config));
+        var bracketed = false;
+        var sawUnknown = false;
+        var iteration = 0;
+        List<Models.PlacedBuilding>? best = null;
+        var (bestW, bestH) = (0, 0);
+
+        while (iteration < config.MaxIterations)
+        {
+            if (bracketed ? lo >= hi : lo > maxSteps)
+                break;
+
+            var k = bracketed ? lo + (hi - lo) / 2 : hi;
+            (w, h) = BoundsAt(baseW, baseH, config, k);
+            var (attempt, placements) = await RunAttemptAsync(
+                placementSolver, ++iteration, w, h, config, cancellationToken);
+            attempts.Add(attempt);
+
+            yield return new Models.SolverStreamItem<Models.SolverAttempt>
+            {
+                Type = "attempt",
+                Data = attempt
+            };
+
+            if (attempt.Status == "sat")
+            {
+                best = placements;
+                (bestW, bestH) = (w, h);
+                hi = k;
+                bracketed = true;
+                continue;
+            }
+
+            sawUnknown |= attempt.Status == "unknown";
+            lo = k + 1;
+            if (!bracketed)
+                hi = Math.Min(maxSteps, Math.Max(hi * 2, hi + 1));
+        }
+
+        // With no fixed dimension both sides grew by the same step count, and
+        // one step less on both is infeasible. Shrinking a single axis may
+        // still fit, which is what the old alternating expansion could reach.
+        if (best != null && config.FixedDimensionMode == FixedDimensionMode.None && hi > 0)
+        {
+            var step = Math.Max(1, config.ExpansionStep);
+            var (fullW, fullH) = (bestW, bestH);
+
+            foreach (var (candW, candH) in new[] { (fullW - step, fullH), (fullW, fullH - step) })
+            {
+                if (iteration >= config.MaxIterations)
+                    break;
+                if ((long)candW * candH >= (long)bestW * bestH)
+                    continue;
+
+                var (attempt, placements) = await RunAttemptAsync(
+                    placementSolver, ++iteration, candW, candH, config, cancellationToken);
+                attempts.Add(attempt);
+
+                yield return new Models.SolverStreamItem<Models.SolverAttempt>
+                {
+                    Type = "attempt",
+                    Data = attempt
+                };
+
+                if (attempt.Status == "sat")
+                {
+                    best = placements;
+                    (bestW, bestH) = (candW, candH);
+                }
+            }
+        }
+
+        if (best != null)
+        {
+            var elapsed = (DateTime.Now - startTime).TotalMilliseconds;
+            yield return new Models.SolverStreamItem<Models.LayoutSolution>
+            {
+                Type = "solution",
+                Data = new Models.LayoutSolution
+                {
+                    Status = "sat",
+                    Bounds = new() { { "width", bestW }, { "height", bestH } },
+                    Placements = best,
+                    Conveyors = new(),
+                    Attempts = attempts,
+                    ElapsedMs = elapsed
+                }
+            };
+            yield break;
+        }
+
+        // Exhausted iterations or every step count up to the stacking bound
+        var finalElapsed = (DateTime.Now - startTime).TotalMilliseconds;
+        yield return new Models.SolverStreamItem<Models.LayoutSolution>
+        {
+            Type = "solution",
+            Data = new Models.LayoutSolution
+            {
+                Status = sawUnknown ? "unknown" : "unsat",
+                Bounds = new() { { "width", w }, { "height", h } },
+                Placements = new(),
+                Conveyors = new(),
+                Attempts = attempts,
+                ElapsedMs = finalElapsed
+            }
+        };
+    }
+}
+
+// Placement model built once per graph and re-solved for different bounds.
+// Only the domains of the shared width/height variables change between
+// attempts; positions and the NoOverlap2D constraint are reused.
+public class IncrementalPlacementSolver
+{
+    private readonly Models.ProductionGraph _graph;
+    private readonly CpModel _model = new();
+    private readonly IntVar _width;
+    private readonly IntVar _height;
+    private readonly int _maxWidth;
+    private readonly int _maxHeight;
+
+    // Per-node footprints and position variables, indexed like graph.Nodes
+    private readonly int[] _lengths;
+    private readonly int[] _widths;
+    private readonly IntVar[] _xs;
+    private readonly IntVar[] _ys;
+    private readonly int _longestLength;
+    private readonly int _widestWidth;
+    private readonly long _totalArea;
+
+    private (long X, long Y)[]? _lastSolution;
+
+    public IncrementalPlacementSolver(Models.ProductionGraph graph, int maxWidth, int maxHeight)
+    {
+        _graph = graph;
+        _maxWidth = maxWidth;
+        _maxHeight = maxHeight;
+        _width = _model.NewIntVar(0, maxWidth, "width");
+        _height = _model.NewIntVar(0, maxHeight, "height");
+
+        var n = graph.Nodes.Count;
+        _lengths = new int[n];
+        _widths = new int[n];
+        _xs = new IntVar[n];
+        _ys = new IntVar[n];
+
+        var noOverlap = _model.AddNoOverlap2D();
+
+        for (int i = 0; i < n; i++)
+        {
+            var node = graph.Nodes[i];
+            var def = BuildingDefinitions.Buildings[node.Type];
+            _lengths[i] = def.Length;
+            _widths[i] = def.Width;
+            _longestLength = Math.Max(_longestLength, def.Length);
+            _widestWidth = Math.Max(_widestWidth, def.Width);
+            _totalArea += (long)def.Length * def.Width;
+
+            var x = _model.NewIntVar(0, Math.Max(0, maxWidth - def.Length), $"{node.Id}_x");
+            var y = _model.NewIntVar(0, Math.Max(0, maxHeight - def.Width), $"{node.Id}_y");
+            _xs[i] = x;
+            _ys[i] = y;
+
+            noOverlap.AddRectangle(
+                _model.NewFixedSizeIntervalVar(x, def.Length, $"{node.Id}_xi"),
+                _model.NewFixedSizeIntervalVar(y, def.Width, $"{node.Id}_yi")
+            );
+
+            _model.Add(x + def.Length <= _width);
+            _model.Add(y + def.Width <= _height);
+        }
+
+        // Anchor first building at origin
+        if (n > 0)
+        {
+            _model.Add(_xs[0] == 0);
+            _model.Add(_ys[0] == 0);
+        }
+
+        // Buildings of the same type are interchangeable. Order each one after
+        // the previous building of its type by (x, y) so that permutations of a
+        // placement are not explored separately. The anchored first building
+        // has the smallest possible key, so it stays consistent with this.
+        var rowStride = (long)maxHeight + 1;
+        var previousOfType = new Dictionary<BuildingType, int>();
+        for (int i = 0; i < n; i++)
+        {
+            var type = graph.Nodes[i].Type;
+            if (previousOfType.TryGetValue(type, out var p))
+                _model.Add(_xs[p] * rowStride + _ys[p] < _xs[i] * rowStride + _ys[i]);
+            previousOfType[type] = i;
+        }
+    }
+
+    public (string Status, List<Models.PlacedBuilding> Placements) Solve(
+        int width,
+        int height,
+        int timeoutMs,
+        CancellationToken cancellationToken = default
+    )
+    {
+        if (width > _maxWidth || height > _maxHeight)
+            throw new ArgumentOutOfRangeException(
+                nameof(width),
+                $"Bounds {width}x{height} exceed the model limit {_maxWidth}x{_maxHeight}"
+            );
+
+        // Bounds smaller than the combined footprint, or narrower than a
+        // single building, are trivially infeasible; skip the solver call.
+        if ((long)width * height < _totalArea)
+            return ("unsat", new());
+        if (_longestLength > width || _widestWidth > height)
+            return ("unsat", new());
+
+        FixDomain(_width, width);
+        FixDomain(_height, height);
+        HintFromLastSolution(width, height);
+
+        var solver = new CpSolver
+        {
+            StringParameters = FormattableString.Invariant(
+                $"max_time_in_seconds:{timeoutMs / 1000.0} num_search_workers:{Environment.ProcessorCount} log_search_progress:true log_to_stdout:false"
+            )
+        };
+
+        // StopSearch is a no-op until Solve has created its internal wrapper,
+        // so a token cancelled just before that point would be missed by the
+        // registration alone. The log callback only runs from inside the
+        // native search, where the wrapper exists, so re-checking the token
+        // there stops such a search as soon as its first log line is emitted.
+        solver.SetLogCallback(_ =>
+        {
+            if (cancellationToken.IsCancellationRequested)
+                solver.StopSearch();
+        });
+        using var registration = cancellationToken.Register(solver.StopSearch);
+        cancellationToken.ThrowIfCancellationRequested();
+        var result = solver.Solve(_model);
+
+        // A stopped search reports Unknown (or a partial Feasible); don't pass
+        // that off as a real result.
+        cancellationToken.ThrowIfCancellationRequested();
+
+        if (result == CpSolverStatus.Optimal || result == CpSolverStatus.Feasible)
+        {
+            var placements = new List<Models.PlacedBuilding>(_xs.Length);
+            _lastSolution ??= new (long X, long Y)[_xs.Length];
+
+            for (int i = 0; i < _xs.Length; i++)
+            {
+                _lastSolution[i] = (solver.Value(_xs[i]), solver.Value(_ys[i]));
+
+                placements.Add(
+                    new Models.PlacedBuilding
+                    {
+                        NodeId = _graph.Nodes[i].Id,
+                        X = (int)_lastSolution[i].X,
+                        Y = (int)_lastSolution[i].Y,
+                        Width = _lengths[i],
+                        Height = _widths[i]
+                    }
+                );
+            }
+
+            return ("sat", placements);
+        }
+
+        if (result == CpSolverStatus.Infeasible)
+            return ("unsat", new());
+
+        return ("unknown", new());
+    }
+
+    // Seed the search with the most recent feasible layout, clamped into the
+    // current bounds. Most buildings keep a valid position when the bounds
+    // shrink, so CP-SAT only has to repair the ones that fall outside.
+    private void HintFromLastSolution(int width, int height)
+    {
+        if (_lastSolution == null)
+            return;
+
+        _model.ClearHints();
+        for (int i = 0; i < _xs.Length; i++)
+        {
+            _model.AddHint(_xs[i], Math.Clamp(_lastSolution[i].X, 0, Math.Max(0, width - _lengths[i])));
+            _model.AddHint(_ys[i], Math.Clamp(_lastSolution[i].Y, 0, Math.Max(0, height - _widths[i])));
+        }
+    }
+
+    private void FixDomain(IntVar variable, long value)
+    {
+        var domain = _model.Model.Variables[variable.Index].Domain;
+        domain.Clear();
+        domain.Add(value);
+        domain.Add(value);
+    }
+}
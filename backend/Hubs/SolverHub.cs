@@ -1,14 +1,19 @@
 namespace EndField.Solver.Hubs;
 
+using System.Runtime.CompilerServices;
 using Microsoft.AspNetCore.SignalR;
 
 public class SolverHub : Hub
 {
-    public async IAsyncEnumerable<object> Solve(Models.ProductionGraph graph, Models.SolverConfig config)
+    public async IAsyncEnumerable<object> Solve(
+        Models.ProductionGraph graph,
+        Models.SolverConfig config,
+        [EnumeratorCancellation] CancellationToken cancellationToken
+    )
     {
         await Task.Yield();
 
-        await foreach (var item in Z3Solver.SolveIterative(graph, config))
+        await foreach (var item in CpSatSolver.SolveIterative(graph, config, cancellationToken))
         {
             yield return item;
         }
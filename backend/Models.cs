@@ -97,3 +97,9 @@ public class LayoutSolution
     public required List<SolverAttempt> Attempts { get; set; }
     public required double ElapsedMs { get; set; }
 }
+
+public class SolverStreamItem<T>
+{
+    public required string Type { get; set; } // "attempt" | "solution"
+    public required T Data { get; set; }
+}
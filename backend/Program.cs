@@ -18,6 +18,12 @@ builder.Services.AddSignalR()
         options.PayloadSerializerOptions.Converters.Add(
             new System.Text.Json.Serialization.JsonStringEnumConverter(
                 System.Text.Json.JsonNamingPolicy.CamelCase));
+        // Generated metadata first; reflection covers any payload type the
+        // context does not register.
+        options.PayloadSerializerOptions.TypeInfoResolver =
+            System.Text.Json.Serialization.Metadata.JsonTypeInfoResolver.Combine(
+                EndField.Solver.Models.SolverJsonContext.Default,
+                new System.Text.Json.Serialization.Metadata.DefaultJsonTypeInfoResolver());
     });
 
 var app = builder.Build();
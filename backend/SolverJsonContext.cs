@@ -0,0 +1,16 @@
+namespace EndField.Solver.Models;
+
+using System.Text.Json.Serialization;
+
+// Compile-time serialization metadata for hub payloads, so SignalR does not
+// build reflection-based converters for these types at runtime.
+[JsonSourceGenerationOptions(PropertyNamingPolicy = JsonKnownNamingPolicy.CamelCase)]
+[JsonSerializable(typeof(ProductionGraph))]
+[JsonSerializable(typeof(SolverConfig))]
+[JsonSerializable(typeof(SolverAttempt))]
+[JsonSerializable(typeof(LayoutSolution))]
+[JsonSerializable(typeof(SolverStreamItem<SolverAttempt>))]
+[JsonSerializable(typeof(SolverStreamItem<LayoutSolution>))]
+internal partial class SolverJsonContext : JsonSerializerContext
+{
+}
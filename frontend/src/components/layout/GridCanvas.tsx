@@ -22,10 +22,11 @@ const BUILDING_INFO: Record<
   crusher: { fill: '#7c3aed', stroke: '#a78bfa', name: '粉碎机' },
 }
 
-/** Golden-angle hue assignment for material flow colors */
-function getItemColor(item: string, allItems: string[]): string {
-  const idx = allItems.indexOf(item)
-  const hue = (idx * 137.5) % 360
+const BUILDING_TYPES = Object.keys(BUILDING_INFO)
+
+/** Golden-angle hue assignment for material flow colors, by first-seen item index */
+function getItemColor(itemIndex: number): string {
+  const hue = (itemIndex * 137.5) % 360
   return `hsl(${hue}, 70%, 60%)`
 }
 
@@ -135,37 +136,38 @@ function drawConveyors(
   cellSize: number,
   padding: number,
 ) {
-  const allItems = [...new Set(edges.map((e) => e.item))]
-
-  // Group edges by source/destination for port distribution
-  const outgoing = new Map<string, MaterialFlowEdge[]>()
-  const incoming = new Map<string, MaterialFlowEdge[]>()
-  for (const edge of edges) {
-    if (!outgoing.has(edge.fromId)) outgoing.set(edge.fromId, [])
-    outgoing.get(edge.fromId)!.push(edge)
-    if (!incoming.has(edge.toId)) incoming.set(edge.toId, [])
-    incoming.get(edge.toId)!.push(edge)
-  }
-
-  for (const edge of edges) {
+  // Item color index and per-building port slots, assigned in one pass
+  // so the draw loop below needs no linear searches
+  const itemIndex = new Map<string, number>()
+  const outCount = new Map<string, number>()
+  const inCount = new Map<string, number>()
+  const outSlot: number[] = []
+  const inSlot: number[] = []
+  edges.forEach((edge, i) => {
+    if (!itemIndex.has(edge.item)) itemIndex.set(edge.item, itemIndex.size)
+    outSlot[i] = outCount.get(edge.fromId) ?? 0
+    outCount.set(edge.fromId, outSlot[i] + 1)
+    inSlot[i] = inCount.get(edge.toId) ?? 0
+    inCount.set(edge.toId, inSlot[i] + 1)
+  })
+
+  edges.forEach((edge, i) => {
     const from = placementMap.get(edge.fromId)
     const to = placementMap.get(edge.toId)
-    if (!from || !to) continue
+    if (!from || !to) return
 
-    const color = getItemColor(edge.item, allItems)
+    const color = getItemColor(itemIndex.get(edge.item)!)
 
     // Distribute port positions across building width
-    const outEdges = outgoing.get(edge.fromId)!
-    const outIdx = outEdges.indexOf(edge)
-    const outTotal = outEdges.length
+    const outIdx = outSlot[i]
+    const outTotal = outCount.get(edge.fromId)!
     const fromX =
       (from.x + padding) * cellSize +
       ((outIdx + 0.5) / outTotal) * from.width * cellSize
     const fromY = (from.y + padding + from.height) * cellSize + 2
 
-    const inEdges = incoming.get(edge.toId)!
-    const inIdx = inEdges.indexOf(edge)
-    const inTotal = inEdges.length
+    const inIdx = inSlot[i]
+    const inTotal = inCount.get(edge.toId)!
     const toX =
       (to.x + padding) * cellSize +
       ((inIdx + 0.5) / inTotal) * to.width * cellSize
@@ -190,7 +192,7 @@ function drawConveyors(
     ctx.lineTo(toX + arrowSize, toY - arrowSize * 1.5)
     ctx.closePath()
     ctx.fill()
-  }
+  })
 }
 
 // ─── Component ───────────────────────────────────────────────
@@ -247,21 +249,18 @@ export function GridCanvas({ solution, graph }: GridCanvasProps) {
     ctx.fillStyle = '#0f172a'
     ctx.fillRect(0, 0, logicalW, logicalH)
 
-    // Grid dots
+    // Grid dots — one subpath per dot, filled with a single call
     ctx.fillStyle = '#1e293b'
+    ctx.beginPath()
     for (let x = 0; x <= bounds.width; x++) {
       for (let y = 0; y <= bounds.height; y++) {
-        ctx.beginPath()
-        ctx.arc(
-          (x + PADDING) * CELL_SIZE,
-          (y + PADDING) * CELL_SIZE,
-          1,
-          0,
-          Math.PI * 2,
-        )
-        ctx.fill()
+        const cx = (x + PADDING) * CELL_SIZE
+        const cy = (y + PADDING) * CELL_SIZE
+        ctx.moveTo(cx + 1, cy)
+        ctx.arc(cx, cy, 1, 0, Math.PI * 2)
       }
     }
+    ctx.fill()
 
     // Bounds border
     ctx.strokeStyle = '#334155'
@@ -322,26 +321,24 @@ export function GridCanvas({ solution, graph }: GridCanvasProps) {
     }
   }, [solution, graph])
 
-  // Build legend data
-  const legend = solution?.status === 'sat'
-    ? Object.entries(BUILDING_INFO)
-        .map(([key, info]) => ({
-          key,
-          ...info,
-          count: solution.placements.filter((p) => {
-            const type = Object.keys(BUILDING_INFO).find((k) => p.nodeId.startsWith(k))
-            return type === key
-          }).length,
-        }))
-        .filter((l) => l.count > 0)
-    : []
+  // Build legend data: count placements per type in a single pass
+  const typeCounts = new Map<string, number>()
+  if (solution?.status === 'sat') {
+    for (const p of solution.placements) {
+      const type = BUILDING_TYPES.find((k) => p.nodeId.startsWith(k))
+      if (type) typeCounts.set(type, (typeCounts.get(type) ?? 0) + 1)
+    }
+  }
+  const legend = Object.entries(BUILDING_INFO)
+    .map(([key, info]) => ({ key, ...info, count: typeCounts.get(key) ?? 0 }))
+    .filter((l) => l.count > 0)
 
   // Material flow legend
   const materialLegend =
     solution?.status === 'sat' && graph
-      ? [...new Set(graph.edges.map((e) => e.item))].map((item, _idx, arr) => ({
+      ? [...new Set(graph.edges.map((e) => e.item))].map((item, idx) => ({
           item,
-          color: getItemColor(item, arr),
+          color: getItemColor(idx),
         }))
       : []
 